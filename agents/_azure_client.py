@@ -0,0 +1,42 @@
+import os
+from functools import lru_cache
+import httpx
+from dotenv import load_dotenv
+from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
+
+load_dotenv()
+
+api_key = os.getenv("OAI_KEY")
+api_endpoint = os.getenv("OAI_ENDPOINT")
+
+# One keep-alive HTTP/2 connection pool shared by every agent, so model calls
+# after the first reuse open connections instead of paying a TLS handshake
+http_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60),
+)
+
+@lru_cache(maxsize=None)
+def get_azure_client(model: str = "gpt-4o") -> AzureOpenAIChatCompletionClient:
+    """
+    Return the shared Azure OpenAI client for a model deployment.
+
+    Args:
+        model: Azure deployment name, e.g. "gpt-4o" or "o4-mini"
+
+    Returns:
+        One client per model, all sending requests through http_client
+    """
+    return AzureOpenAIChatCompletionClient(
+        api_key=api_key,
+        azure_endpoint=api_endpoint,
+        model=model,
+        api_version="2024-05-13",
+        model_info={
+            "json_output": True,
+            "function_calling": True,
+            "vision": False,
+            "family": "unknown",
+        },
+        http_client=http_client,
+    )
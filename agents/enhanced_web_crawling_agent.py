@@ -1,116 +1,131 @@
-import os
+import re
+import asyncio
 import json
-from typing import Dict, List, Optional, Any
+import threading
+import logging
+from typing import Dict, List, Optional, Any, Tuple
+from string import Formatter
 from dotenv import load_dotenv
+from cachetools import TTLCache
 from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.messages import TextMessage
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
+from agents._azure_client import get_azure_client
 from autogen_core.tools import FunctionTool
 from autogen_core import CancellationToken
 from tools.web_crawling_tools import web_crawling_tool
-from tools.bedeo_ontology_tool import load_bedeo_ontology, get_bedeo_template
+
+# Prefer orjson for parsing crawl payloads; fall back to the stdlib
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
 load_dotenv()
 
-def crawl_and_structure(url: str) -> str:
+logger = logging.getLogger(__name__)
+
+# Content-extraction patterns, compiled once at import
+_HECTARE_RE = re.compile(r'(\d+\.?\d*)\s*hectare', re.IGNORECASE)
+_UNITS_RE = re.compile(r'(\d+)\s*units', re.IGNORECASE)
+_STATUS_RE = re.compile(r'under construction|complete|proposal', re.IGNORECASE)
+# "curl [-flags] URL": leading option tokens are skipped and the URL must be http(s)
+_CURL_RE = re.compile(r'^\s*curl\s+(?:-\S+\s+)*<?["\']?(https?://[^\s"\'>]+)', re.IGNORECASE)
+
+# Status keywords in priority order and the status each one maps to
+_STATUS_MAP = {
+    'under construction': "Under Construction",
+    'complete': "Completed",
+    'proposal': "Proposals under evaluation",
+}
+
+# Sentinel keywords and the tags they imply. A keyword that contains another
+# one ("City of Toronto" / "Toronto") carries both tags, since a single regex
+# pass does not report overlapping matches.
+_KEYWORD_TAGS = {
+    'Currie': ('currie',),
+    'Toronto': ('toronto',),
+    'Bellevue': ('bellevue',),
+    '35 Bellevue': ('addr_bellevue', 'bellevue'),
+    '11 Brock': ('addr_brock',),
+    'St. Clare': ('stclare',),
+    'St Clare': ('stclare',),
+    'KMCLT': ('kmclt',),
+    'Kensington Market Community Land Trust': ('kmclt',),
+    'City of Toronto': ('toronto_org', 'toronto'),
+    'CMHC': ('cmhc',),
+    'Canada Mortgage and Housing': ('cmhc',),
+}
+_KEYWORD_RE = re.compile('|'.join(
+    re.escape(keyword) for keyword in sorted(_KEYWORD_TAGS, key=len, reverse=True)
+))
+# Tags that may also be triggered by the page title
+_TITLE_TAGS = frozenset({'currie', 'toronto', 'bellevue'})
+
+# Field values implied by each keyword tag, applied in order so later rules win
+_KEYWORD_RULES = {
+    'currie': {
+        "asset_name": "Currie",
+        "asset_label": "Currie Development Site",
+        "city": "Calgary",
+        "province": "Alberta",
+    },
+    'toronto': {"city": "Toronto", "province": "Ontario"},
+    'bellevue': {"asset_name": "Bellevue", "asset_label": "35 Bellevue Avenue"},
+    'addr_bellevue': {"asset_label": "35 Bellevue Avenue"},
+    'addr_brock': {"asset_name": "Brock", "asset_label": "11 Brock Avenue"},
+    'stclare': {"org_name": "StClares", "org_legal_name": "St. Clare's Multifaith Housing Society"},
+    'kmclt': {"org_name": "KMCLT", "org_legal_name": "Kensington Market Community Land Trust"},
+    'toronto_org': {"org_name": "CityOfToronto", "org_legal_name": "City of Toronto"},
+    'cmhc': {"org_name": "CMHC", "org_legal_name": "Canada Mortgage and Housing Corporation"},
+}
+
+# Values no keyword rule overrides
+_DEFAULT_COUNTRY = "Canada"
+_DEFAULT_ASSET_ID = "CLC_LH_AB_CGY_L002"
+
+# Values used when nothing more specific is found on the page
+_DEFAULT_FIELDS = {
+    "org_name": "CanadaLandsCompany",
+    "org_legal_name": "Canada Lands Company",
+    "opportunity_desc": "Federal Lands Development Opportunity",
+    "status": "Active",
+    "asset_name": "CurrieLot",
+    "asset_label": "Currie Development Site",
+    "asset_id": _DEFAULT_ASSET_ID,
+    "area": "0.4",
+    "city": "Calgary",
+    "province": "Alberta",
+    "country": _DEFAULT_COUNTRY,
+}
+
+def _keyword_hits(text: str) -> set:
+    """Return the set of keyword tags found in a single scan of text."""
+    return {tag for keyword in _KEYWORD_RE.findall(text) for tag in _KEYWORD_TAGS[keyword]}
+
+def _compile_template(template: str) -> List[Tuple[str, Optional[str]]]:
     """
-    Complete workflow: crawl URL and structure as RDF/Turtle using BEDEO ontology.
-    
-    Args:
-        url: URL to crawl
-    
-    Returns:
-        RDF/Turtle structured data
+    Split a str.format-style template into (literal, field_name) chunks once,
+    so rendering is a single join instead of re-parsing the template.
     """
-    try:
-        # Step 1: Get BEDEO template
-        print(f"📋 Loading BEDEO ontology...")
-        ontology = load_bedeo_ontology()
-        template = get_bedeo_template()
-        
-        # Step 2: Crawl the URL
-        print(f"🕷️ Crawling: {url}")
-        crawl_result = web_crawling_tool(url, max_depth=1, max_links_per_page=5)
-        data = json.loads(crawl_result)
-        
-        # Step 3: Extract key information
-        print(f"🔍 Extracting information...")
-        
-        # Default values
-        org_name = "CanadaLandsCompany"
-        org_legal_name = "Canada Lands Company"
-        opportunity_desc = "Federal Lands Development Opportunity"
-        status = "Active"
-        asset_name = "CurrieLot"
-        asset_label = "Currie Development Site"
-        asset_id = "CLC_LH_AB_CGY_L002"
-        area = "0.4"
-        city = "Calgary"
-        province = "Alberta"
-        country = "Canada"
-        
-        # Try to extract from crawled data
-        if 'crawled_data' in data and len(data['crawled_data']) > 0:
-            content = data['crawled_data'][0].get('content', '')
-            title = data['crawled_data'][0].get('title', '')
-            
-            # Extract information from content
-            if 'Currie' in content or 'Currie' in title:
-                asset_name = "Currie"
-                asset_label = "Currie Development Site"
-                city = "Calgary"
-                province = "Alberta"
-            if 'Toronto' in content or 'Toronto' in title:
-                city = "Toronto"
-                province = "Ontario"
-            if 'Bellevue' in content or 'Bellevue' in title:
-                asset_name = "Bellevue"
-                asset_label = "35 Bellevue Avenue"
-                
-            # Try to extract address if present
-            if '35 Bellevue' in content:
-                asset_label = "35 Bellevue Avenue"
-            if '11 Brock' in content:
-                asset_name = "Brock"
-                asset_label = "11 Brock Avenue"
-                
-            # Extract organization names
-            if 'St. Clare' in content or 'St Clare' in content:
-                org_name = "StClares"
-                org_legal_name = "St. Clare's Multifaith Housing Society"
-            if 'KMCLT' in content or 'Kensington Market Community Land Trust' in content:
-                org_name = "KMCLT"
-                org_legal_name = "Kensington Market Community Land Trust"
-            if 'City of Toronto' in content:
-                org_name = "CityOfToronto"
-                org_legal_name = "City of Toronto"
-            if 'CMHC' in content or 'Canada Mortgage and Housing' in content:
-                org_name = "CMHC"
-                org_legal_name = "Canada Mortgage and Housing Corporation"
-                
-            # Extract status
-            if 'under construction' in content.lower():
-                status = "Under Construction"
-            elif 'complete' in content.lower():
-                status = "Completed"
-            elif 'proposal' in content.lower():
-                status = "Proposals under evaluation"
-                
-            # Extract area/size
-            if 'hectare' in content.lower():
-                import re
-                match = re.search(r'(\d+\.?\d*)\s*hectare', content.lower())
-                if match:
-                    area = match.group(1)
-            if 'units' in content.lower():
-                match = re.search(r'(\d+)\s*units', content.lower())
-                if match:
-                    opportunity_desc = f"Affordable Housing Development - {match.group(1)} units"
-        
-        # Step 4: Generate RDF/Turtle
-        print(f"📝 Generating RDF/Turtle...")
-        
-        rdf_output = f"""@prefix bedeo: <https://csse.utoronto.ca/> .
+    chunks = []
+    for literal, field_name, format_spec, conversion in Formatter().parse(template):
+        if format_spec or conversion:
+            raise ValueError(f"Unsupported template field: {{{field_name}}}")
+        chunks.append((literal, field_name))
+    return chunks
+
+def _render_template(chunks: List[Tuple[str, Optional[str]]], fields: Dict[str, str]) -> str:
+    """Render a template compiled by _compile_template."""
+    parts = []
+    for literal, field_name in chunks:
+        parts.append(literal)
+        if field_name is not None:
+            parts.append(fields[field_name])
+    return "".join(parts)
+
+# Output templates, pre-split into chunks and rendered from a single field dict
+_RDF_TMPL = """@prefix bedeo: <https://csse.utoronto.ca/> .
 @prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
 @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
 
@@ -142,8 +157,8 @@ bedeo:address_{asset_name}
     bedeo:has_locality_name "{city}"^^xsd:string ;
     bedeo:has_province_name "{province}"^^xsd:string ;
     bedeo:has_country_name "{country}"^^xsd:string ."""
-        
-        result = f"""## 📊 Crawled Data Summary
+
+_RESULT_TMPL = """## 📊 Crawled Data Summary
 
 **🏢 Organization:** {org_legal_name}  
 **📍 Location:** {city}, {province}, {country}  
@@ -189,29 +204,96 @@ bedeo:address_{asset_name}
 1. **For SPARQL Queries:** Copy the RDF/Turtle data above
 2. **For Analysis:** Use the structured information to understand the opportunity
 3. **For Integration:** Import into your RDF triplestore using the BEDEO ontology"""
+
+_RDF_CHUNKS = _compile_template(_RDF_TMPL)
+_RESULT_CHUNKS = _compile_template(_RESULT_TMPL)
+
+# Recently structured URLs, so re-running the same "curl" skips the crawl
+_RESULT_CACHE = TTLCache(maxsize=256, ttl=600)
+_RESULT_CACHE_LOCK = threading.Lock()
+
+def crawl_and_structure(url: str) -> str:
+    """
+    Complete workflow: crawl URL and structure as RDF/Turtle using BEDEO ontology.
+    
+    Results for successfully crawled URLs are cached for 10 minutes; call
+    crawl_and_structure.cache_clear() to drop them.
+    
+    Args:
+        url: URL to crawl
+    
+    Returns:
+        RDF/Turtle structured data
+    """
+    with _RESULT_CACHE_LOCK:
+        cached = _RESULT_CACHE.get(url)
+    if cached is not None:
+        return cached
+    
+    try:
+        # Step 1: Crawl the URL
+        logger.debug("Crawling: %s", url)
+        crawl_result = web_crawling_tool(url, max_depth=1, max_links_per_page=5)
+        data = _loads(crawl_result)
+        
+        # Step 2: Extract key information
+        logger.debug("Extracting information from %s", url)
+        
+        # Try to extract from crawled data
+        fields = dict(_DEFAULT_FIELDS)
+        crawled_ok = False
+        if 'crawled_data' in data and len(data['crawled_data']) > 0:
+            crawled_ok = data['crawled_data'][0].get('content_type') != 'error'
+            content = data['crawled_data'][0].get('content', '')
+            title = data['crawled_data'][0].get('title', '')
+            
+            # Extract names and locations from keyword hits
+            hits = _keyword_hits(content) | (_keyword_hits(title) & _TITLE_TAGS)
+            for tag, values in _KEYWORD_RULES.items():
+                if tag in hits:
+                    fields.update(values)
+                
+            # Extract status
+            found = {keyword.lower() for keyword in _STATUS_RE.findall(content)}
+            for keyword, status in _STATUS_MAP.items():
+                if keyword in found:
+                    fields["status"] = status
+                    break
+                
+            # Extract area/size
+            match = _HECTARE_RE.search(content)
+            if match:
+                fields["area"] = match.group(1)
+            match = _UNITS_RE.search(content)
+            if match:
+                fields["opportunity_desc"] = f"Affordable Housing Development - {match.group(1)} units"
+        
+        # Step 3: Generate RDF/Turtle
+        logger.debug("Generating RDF/Turtle for %s", url)
+        
+        fields["rdf_output"] = _render_template(_RDF_CHUNKS, fields)
+        result = _render_template(_RESULT_CHUNKS, fields)
+        
+        # Don't pin failed crawls; the next call should try the network again
+        if crawled_ok:
+            with _RESULT_CACHE_LOCK:
+                _RESULT_CACHE[url] = result
         
         return result
         
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
+        logger.error("Failed to crawl and structure %s: %s", url, e)
         return f"Error processing URL: {str(e)}"
 
-# Azure client configuration
-api_key = os.getenv("OAI_KEY")
-api_endpoint = os.getenv("OAI_ENDPOINT")
-
-client = AzureOpenAIChatCompletionClient(
-    api_key=api_key,
-    azure_endpoint=api_endpoint,
-    model="o4-mini",
-    api_version="2024-05-13",
-    model_info={
-        "json_output": True,
-        "function_calling": True,
-        "vision": False,
-        "family": "unknown",
-    },
-)
+def _clear_result_cache() -> None:
+    """Drop all cached crawl_and_structure results."""
+    with _RESULT_CACHE_LOCK:
+        _RESULT_CACHE.clear()
+
+crawl_and_structure.cache_clear = _clear_result_cache
+
+# Shared Azure OpenAI client (one keep-alive HTTP/2 pool for all agents)
+client = get_azure_client("o4-mini")
 
 # Single tool that does everything
 complete_tool = FunctionTool(
@@ -224,18 +306,19 @@ simple_agent = AssistantAgent(
     name="SimpleWebCrawlingAgent",
     model_client=client,
     tools=[complete_tool],
-    system_message="""You are a web crawling agent. 
-
-When user gives "curl [URL]" command:
-Call crawl_and_structure(url="[THE URL]") 
-
-That's it. One tool call does everything.""",
+    system_message="Call crawl_and_structure(url=...) whenever the user sends 'curl URL'. Return only the tool output.",
+    reflect_on_tool_use=False,  # the tool output is the answer; skip the extra model round trip
 )
 
 async def run_simple_agent(user_input: str) -> str:
     """Run the simplified agent."""
+    # "curl <URL>" always maps to the one tool call, so skip the model round trip
+    match = _CURL_RE.match(user_input)
+    if match:
+        return await asyncio.to_thread(crawl_and_structure, match.group(1))
+    
     response = await simple_agent.on_messages(
         [TextMessage(content=user_input, source="user")],
         cancellation_token=CancellationToken()
     )
-    return response.chat_message.content
\ No newline at end of file
+    return response.chat_message.content
@@ -1,56 +1,185 @@
 import os
 import json
+import asyncio
+import random
+import logging
+import functools
+from collections import defaultdict
+from itertools import chain
+from urllib.parse import urlparse
 from typing import Dict, List, Optional, Any, AsyncGenerator
 from dotenv import load_dotenv
 from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.messages import TextMessage
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
+from agents._azure_client import get_azure_client
 from autogen_core.tools import FunctionTool
 from autogen_core import CancellationToken
-from tools.web_crawling_tools import web_crawling_tool
+from tools.web_crawling_tools import web_crawling_tool, web_crawling_tool_async
 from tools.bedeo_ontology_tool import load_bedeo_ontology, get_bedeo_template, validate_rdf_against_bedeo
 
+# Prefer orjson for the large crawl payloads; fall back to the stdlib
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
 load_dotenv()
 
-def crawl_urls_batch(urls: List[str], max_depth: int = 2, max_links_per_page: int = 20) -> str:
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying when they come back for the root page of a crawl
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Failures without an HTTP status that are worth retrying: the exception class
+# names (recorded by the crawler as error_type) of connection drops and timeouts.
+# Bad URLs, TLS errors and oversized responses fail the same way every time.
+_RETRYABLE_ERRORS = {'ConnectionError', 'ConnectTimeout', 'ReadTimeout', 'Timeout', 'ChunkedEncodingError'}
+
+# Upper bound on a server-requested Retry-After wait, in seconds
+_MAX_RETRY_AFTER = 30.0
+
+def _retry_delay(root_page: Dict[str, Any], attempt: int, base_delay: float) -> Optional[float]:
     """
-    Crawl multiple URLs and return structured results.
+    Return how long to wait before retrying a failed crawl, or None if the
+    failure is not transient.
+    """
+    if root_page.get('content_type') != 'error':
+        return None
+    metadata = root_page.get('metadata') or {}
+    status_code = metadata.get('status_code')
+    if status_code is not None:
+        if status_code not in _RETRYABLE_STATUS:
+            return None
+    elif metadata.get('error_type') not in _RETRYABLE_ERRORS:
+        return None
+    retry_after = metadata.get('retry_after')
+    if retry_after and str(retry_after).isdigit():
+        return min(float(retry_after), _MAX_RETRY_AFTER)
+    return base_delay * 2 ** attempt + random.uniform(0, 0.25)
+
+async def _crawl_with_retry(
+    url: str,
+    max_depth: int,
+    max_links_per_page: int,
+    attempts: int = 4,
+    base_delay: float = 0.5
+) -> Dict[str, Any]:
+    """
+    Crawl a URL, retrying with exponential backoff when the root page fails
+    with a transient error (honouring Retry-After on 429/503).
+    """
+    for attempt in range(attempts):
+        try:
+            crawl_result = await web_crawling_tool_async(url, max_depth, max_links_per_page)
+            crawl_data = _loads(crawl_result)
+        except Exception:
+            if attempt == attempts - 1:
+                raise
+            await asyncio.sleep(base_delay * 2 ** attempt + random.uniform(0, 0.25))
+            continue
+        
+        crawled = crawl_data.get('crawled_data') or [{}]
+        delay = _retry_delay(crawled[0], attempt, base_delay)
+        if delay is None or attempt == attempts - 1:
+            return crawl_data
+        await asyncio.sleep(delay)
+
+async def crawl_urls_batch_async(
+    urls: List[str],
+    max_depth: int = 2,
+    max_links_per_page: int = 20,
+    max_concurrency: int = 64,
+    max_per_host: int = 4,
+    out_path: Optional[str] = None
+) -> str:
+    """
+    Crawl multiple URLs concurrently and return structured results.
+    
+    URLs are crawled concurrently so the per-URL network waits overlap instead
+    of adding up. In-flight crawls are bounded overall and per host.
     
     Args:
         urls: List of URLs to crawl
         max_depth: Maximum depth for recursive crawling
         max_links_per_page: Maximum number of links to follow per page
+        max_concurrency: Maximum number of URLs crawled at once
+        max_per_host: Maximum number of URLs crawled at once on the same host
+        out_path: Optional JSONL file to stream per-URL results into as they
+            complete, instead of holding them all in memory
     
     Returns:
-        JSON string with batch crawl results
+        JSON string with batch crawl results, or only the batch summary and
+        output path when out_path is given
     """
-    batch_results = {
-        'batch_summary': {
-            'total_urls_requested': len(urls),
-            'max_depth': max_depth,
-            'max_links_per_page': max_links_per_page
-        },
-        'url_results': []
+    batch_summary = {
+        'total_urls_requested': len(urls),
+        'max_depth': max_depth,
+        'max_links_per_page': max_links_per_page
     }
     
-    for url in urls:
+    sem = asyncio.Semaphore(max_concurrency)
+    host_sems = defaultdict(lambda: asyncio.Semaphore(max_per_host))
+    out_file = None
+    
+    async def fetch_one(url: str) -> Optional[Dict[str, Any]]:
         try:
-            crawl_result = web_crawling_tool(url, max_depth, max_links_per_page)
-            crawl_data = json.loads(crawl_result)
-            batch_results['url_results'].append({
+            # Take the host slot first, so URLs queued behind a busy host do
+            # not hold global slots that other hosts could be using
+            async with host_sems[urlparse(url).netloc]:
+                async with sem:
+                    crawl_data = await _crawl_with_retry(url, max_depth, max_links_per_page)
+            url_result = {
                 'requested_url': url,
                 'status': 'success',
                 'data': crawl_data
-            })
+            }
         except Exception as e:
-            batch_results['url_results'].append({
+            url_result = {
                 'requested_url': url,
                 'status': 'error',
                 'error': str(e),
                 'data': None
-            })
+            }
+        
+        if out_file is None:
+            return url_result
+        # Writes happen between awaits, so the event loop serializes them
+        out_file.write(_dumps(url_result) + "\n")
+        return None
     
-    return json.dumps(batch_results, indent=2)
+    if out_path is None:
+        url_results = await asyncio.gather(*[fetch_one(url) for url in urls])
+        return _dumps({'batch_summary': batch_summary, 'url_results': url_results})
+    
+    # Write to a temporary file and move it into place once the batch is done
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as out_file:
+        await asyncio.gather(*[fetch_one(url) for url in urls])
+    os.replace(tmp_path, out_path)
+    
+    return _dumps({'batch_summary': batch_summary, 'out_path': out_path})
+
+def crawl_urls_batch(urls: List[str], max_depth: int = 2, max_links_per_page: int = 20) -> str:
+    """
+    Crawl multiple URLs and return structured results.
+    
+    Synchronous entry point for crawl_urls_batch_async.
+    
+    Args:
+        urls: List of URLs to crawl
+        max_depth: Maximum depth for recursive crawling
+        max_links_per_page: Maximum number of links to follow per page
+    
+    Returns:
+        JSON string with batch crawl results
+    """
+    return asyncio.run(crawl_urls_batch_async(urls, max_depth, max_links_per_page))
 
 def apply_ontology_structuring(
     raw_crawl_data: str,
@@ -105,7 +234,7 @@ def extract_content_pairs(crawled_data: str) -> str:
         JSON string with extracted pairs
     """
     try:
-        data = json.loads(crawled_data)
+        data = _loads(crawled_data)
         pairs = {
             "unstructured_pairs": [],
             "metadata": {
@@ -114,45 +243,41 @@ def extract_content_pairs(crawled_data: str) -> str:
             }
         }
         
-        # Extract unstructured pairs
+        # Collect crawled pages from a single crawl or from batch results
         if 'crawled_data' in data:
-            for item in data['crawled_data']:
-                pairs["unstructured_pairs"].append({
-                    "url": item.get('url', ''),
-                    "content": {
-                        "title": item.get('title', ''),
-                        "text": item.get('content', ''),
-                        "metadata": item.get('metadata', {}),
-                        "content_type": item.get('content_type', ''),
-                        "crawl_depth": item.get('crawl_depth', 0)
-                    }
-                })
-        
-        # Handle batch results
+            items = data['crawled_data']
         elif 'url_results' in data:
-            for url_result in data['url_results']:
-                if url_result['status'] == 'success' and url_result['data']:
-                    crawl_data = url_result['data'].get('crawled_data', [])
-                    for item in crawl_data:
-                        pairs["unstructured_pairs"].append({
-                            "url": item.get('url', ''),
-                            "content": {
-                                "title": item.get('title', ''),
-                                "text": item.get('content', ''),
-                                "metadata": item.get('metadata', {}),
-                                "content_type": item.get('content_type', ''),
-                                "crawl_depth": item.get('crawl_depth', 0)
-                            }
-                        })
+            items = chain.from_iterable(
+                url_result['data'].get('crawled_data', [])
+                for url_result in data['url_results']
+                if url_result['status'] == 'success' and url_result['data']
+            )
+        else:
+            items = ()
+        
+        # Extract unstructured pairs
+        pairs["unstructured_pairs"] = [
+            {
+                "url": item.get('url', ''),
+                "content": {
+                    "title": item.get('title', ''),
+                    "text": item.get('content', ''),
+                    "metadata": item.get('metadata', {}),
+                    "content_type": item.get('content_type', ''),
+                    "crawl_depth": item.get('crawl_depth', 0)
+                }
+            }
+            for item in items
+        ]
         
-        return json.dumps(pairs, indent=2)
+        return _dumps(pairs)
         
     except Exception as e:
-        return json.dumps({
+        return _dumps({
             "error": f"Failed to extract content pairs: {str(e)}",
             "unstructured_pairs": [],
             "metadata": {}
-        }, indent=2)
+        })
 
 def crawl_single_url(url: str, max_depth: int = 1, max_links_per_page: int = 5) -> str:
     """
@@ -167,30 +292,24 @@ def crawl_single_url(url: str, max_depth: int = 1, max_links_per_page: int = 5)
         JSON string with crawl results
     """
     try:
-        print(f"🕷️ Starting to crawl: {url}")
-        print(f"   Max depth: {max_depth}, Max links: {max_links_per_page}")
+        logger.debug("Starting to crawl: %s (max depth: %d, max links: %d)", url, max_depth, max_links_per_page)
         crawl_result = web_crawling_tool(url, max_depth, max_links_per_page)
-        print(f"✅ Crawling completed, data size: {len(crawl_result)} characters")
-        return crawl_result
+        logger.debug("Crawling completed, data size: %d bytes", len(crawl_result))
+        return crawl_result.decode('utf-8')
     except Exception as e:
-        print(f"❌ Crawling failed: {str(e)}")
+        logger.error("Crawling %s failed: %s", url, e)
         return json.dumps({
             "error": f"Failed to crawl URL: {str(e)}",
             "url": url
         }, indent=2)
 
-def get_bedeo_ontology_schema() -> str:
-    """
-    Get the BEDEO ontology schema and template for structuring RDF data.
+@functools.lru_cache(maxsize=1)
+def _render_bedeo_ontology_schema() -> str:
+    """Render the BEDEO reference text once; the ontology does not change at runtime."""
+    ontology = load_bedeo_ontology()
+    template = get_bedeo_template()
     
-    Returns:
-        String containing BEDEO template and available classes/properties
-    """
-    try:
-        ontology = load_bedeo_ontology()
-        template = get_bedeo_template()
-        
-        result = f"""BEDEO ONTOLOGY REFERENCE
+    return f"""BEDEO ONTOLOGY REFERENCE
         
 Template to follow:
 {template}
@@ -204,26 +323,23 @@ Available BEDEO Properties (USE ONLY THESE):
 CRITICAL: You MUST use ONLY the classes and properties from BEDEO ontology.
 DO NOT invent new properties like cmhc:minimumAffordableUnits.
 """
-        return result
+
+def get_bedeo_ontology_schema() -> str:
+    """
+    Get the BEDEO ontology schema and template for structuring RDF data.
+    
+    Returns:
+        String containing BEDEO template and available classes/properties
+    """
+    # Kept as a plain function around the cached renderer so FunctionTool sees
+    # a normal signature, and so load errors are reported but never cached
+    try:
+        return _render_bedeo_ontology_schema()
     except Exception as e:
         return f"Error loading BEDEO ontology: {str(e)}"
 
-# Azure client configuration
-api_key = os.getenv("OAI_KEY")
-api_endpoint = os.getenv("OAI_ENDPOINT")
-
-client = AzureOpenAIChatCompletionClient(
-    api_key=api_key,
-    azure_endpoint=api_endpoint,
-    model="o4-mini",
-    api_version="2024-05-13",
-    model_info={
-        "json_output": True,
-        "function_calling": True,
-        "vision": False,
-        "family": "unknown",
-    },
-)
+# Shared Azure OpenAI client (one keep-alive HTTP/2 pool for all agents)
+client = get_azure_client("o4-mini")
 
 # Create enhanced function tools
 single_crawl_tool = FunctionTool(
@@ -294,7 +410,7 @@ async def run_enhanced_web_crawling_agent(user_input: str) -> AsyncGenerator[str
     
     try:
         # Use the simple runner for more reliable results
-        print("🔄 Agent is processing... (this may take 30-60 seconds)")
+        logger.debug("Agent is processing (this may take 30-60 seconds)")
         response = await run_enhanced_web_crawling_agent_simple(user_input)
         
         # Yield the complete response
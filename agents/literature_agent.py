@@ -6,7 +6,7 @@ from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.messages import TextMessage
 from autogen_core.models import UserMessage
 from autogen_ext.models.azure import AzureAIChatCompletionClient
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
+from agents._azure_client import get_azure_client
 from azure.core.credentials import AzureKeyCredential
 from autogen_core.tools import FunctionTool
 from autogen_core import CancellationToken
@@ -34,22 +34,8 @@ model_name = os.getenv("LITERATURE_AGENT_MODEL", "gpt-4o") # Default to gpt-4o i
 #     },
 # )
 
-api_key = os.getenv("OAI_KEY")
-api_endpoint = os.getenv("OAI_ENDPOINT")
-
-# Azure GitHub Model client
-client = AzureOpenAIChatCompletionClient(
-    api_key=api_key,
-    azure_endpoint=api_endpoint,
-    model="gpt-4o",
-    api_version="2024-05-13",
-    model_info={
-        "json_output": True,
-        "function_calling": True,
-        "vision": False,
-        "family": "unknown",
-    },
-)
+# Shared Azure OpenAI client (one keep-alive HTTP/2 pool for all agents)
+client = get_azure_client("gpt-4o")
 # Wrap arxiv/web search tools
 arxiv_tool = FunctionTool(query_arxiv, description="Searches arXiv for research papers.")
 web_tool = FunctionTool(query_web, description="Searches the web for relevant academic content.")
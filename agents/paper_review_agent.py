@@ -5,7 +5,7 @@ from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.messages import TextMessage
 from autogen_core.models import UserMessage
 from autogen_ext.models.azure import AzureAIChatCompletionClient
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
+from agents._azure_client import get_azure_client
 from azure.core.credentials import AzureKeyCredential
 from autogen_core.tools import FunctionTool
 from autogen_core import CancellationToken
@@ -30,22 +30,8 @@ review_modes = ["rapid", "academic", "visual", "enhanced"]
 #         "family": "unknown"}
 # )
 
-api_key = os.getenv("OAI_KEY")
-api_endpoint = os.getenv("OAI_ENDPOINT")
-
-# Azure GitHub Model client
-client = AzureOpenAIChatCompletionClient(
-    api_key=api_key,
-    azure_endpoint=api_endpoint,
-    model="gpt-4o",
-    api_version="2024-05-13",
-    model_info={
-        "json_output": True,
-        "function_calling": True,
-        "vision": False,
-        "family": "unknown",
-    },
-)
+# Shared Azure OpenAI client (one keep-alive HTTP/2 pool for all agents)
+client = get_azure_client("gpt-4o")
 
 # Register individual tools (optional if directly accessible)
 summarize_tool = FunctionTool(
@@ -1,11 +1,12 @@
-import os
+import asyncio
 from typing import Dict, List, Optional, Any, AsyncGenerator
 from dotenv import load_dotenv
 from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.messages import TextMessage
-from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
+from agents._azure_client import get_azure_client
 from autogen_core.tools import FunctionTool
 from autogen_core import CancellationToken
+from autogen_core.models import SystemMessage, UserMessage
 import json
 from tools.web_crawling_tools import web_crawling_tool
 
@@ -23,7 +24,7 @@ def crawl_website_wrapper(url: str, max_depth: int = 2, max_links_per_page: int
     Returns:
         JSON string with crawl results
     """
-    return web_crawling_tool(url, max_depth)
+    return web_crawling_tool(url, max_depth).decode('utf-8')
 
 def structure_crawled_data(
     crawled_data: str, 
@@ -45,23 +46,105 @@ def structure_crawled_data(
     # The actual structuring logic will be handled by the agent's reasoning
     return f"Raw data to be structured:\n{crawled_data}\n\nTarget schema:\n{ontology_schema}\n\nExamples:\n{few_shot_examples}"
 
-# Azure client configuration following the literature agent pattern
-api_key = os.getenv("OAI_KEY")
-api_endpoint = os.getenv("OAI_ENDPOINT")
-
-# Azure OpenAI client
-client = AzureOpenAIChatCompletionClient(
-    api_key=api_key,
-    azure_endpoint=api_endpoint,
-    model="gpt-4o",
-    api_version="2024-05-13",
-    model_info={
-        "json_output": True,
-        "function_calling": True,
-        "vision": False,
-        "family": "unknown",
-    },
-)
+# Packing limits for structure_crawled_data_batch. Roughly 4 characters per
+# token keeps each packed prompt well inside the model's context window.
+_BATCH_MAX_CHARS = 60000
+_BATCH_MAX_PAGES = 20
+# How much of an unparseable batch response is kept in each page's error entry
+_BATCH_RAW_OUTPUT_CHARS = 500
+
+_BATCH_SYSTEM_PROMPT = """You structure crawled web pages according to an ontology.
+You receive several numbered pages. Structure each page independently and reply with a single JSON object
+mapping every page number (as a string) to that page's structured output, e.g. {"1": {...}, "2": {...}}."""
+
+def _format_page(index: int, page: Dict[str, Any]) -> str:
+    """Render one crawled page as a numbered block of the batch prompt."""
+    return (
+        f"### Page {index}\n"
+        f"URL: {page.get('url', '')}\n"
+        f"Title: {page.get('title', '')}\n"
+        f"Content:\n{page.get('content', '')}\n"
+    )
+
+def _split_batches(blocks: List[str], max_chars: int = _BATCH_MAX_CHARS, max_pages: int = _BATCH_MAX_PAGES) -> List[List[str]]:
+    """Group page blocks into batches that stay under the character and page limits."""
+    batches = []
+    current = []
+    current_chars = 0
+    for block in blocks:
+        if current and (current_chars + len(block) > max_chars or len(current) >= max_pages):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(block)
+        current_chars += len(block)
+    if current:
+        batches.append(current)
+    return batches
+
+async def structure_crawled_data_batch(
+    crawled_pages: List[Dict[str, Any]],
+    ontology_schema: str,
+    few_shot_examples: str = ""
+) -> str:
+    """
+    Structure many crawled pages according to an ontology in as few model calls as possible.
+    
+    Pages are numbered from 1 and packed into prompts of up to _BATCH_MAX_PAGES
+    pages / _BATCH_MAX_CHARS characters; the batches are sent concurrently.
+    
+    Args:
+        crawled_pages: Crawled page dictionaries with url, title and content keys
+        ontology_schema: The target ontology/schema to structure data into
+        few_shot_examples: Few-shot learning examples showing input-output pairs
+    
+    Returns:
+        JSON string mapping each page number to its structured output. Pages
+        whose batch failed, or that the model left out, map to an object with
+        an "error" key instead.
+    """
+    blocks = [_format_page(index, page) for index, page in enumerate(crawled_pages, start=1)]
+    header = f"Target schema:\n{ontology_schema}\n\nExamples:\n{few_shot_examples}\n\nPages:\n"
+    
+    async def structure_batch(batch: List[str], first_page: int) -> Dict[str, Any]:
+        page_numbers = [str(number) for number in range(first_page, first_page + len(batch))]
+        result = await client.create(
+            [SystemMessage(content=_BATCH_SYSTEM_PROMPT), UserMessage(content=header + "\n".join(batch), source="user")],
+            json_output=True,
+        )
+        try:
+            batch_result = json.loads(result.content)
+        except (TypeError, ValueError):
+            batch_result = None
+        
+        if not isinstance(batch_result, dict):
+            # Report the failure against every page of the batch
+            failure = {
+                "error": f"Model returned invalid JSON for pages {page_numbers[0]}-{page_numbers[-1]}",
+                "raw_output": str(result.content)[:_BATCH_RAW_OUTPUT_CHARS],
+            }
+            return {number: failure for number in page_numbers}
+        
+        return {
+            number: batch_result.get(number, {"error": "Model returned no output for this page"})
+            for number in page_numbers
+        }
+    
+    batches = _split_batches(blocks)
+    first_pages = []
+    next_page = 1
+    for batch in batches:
+        first_pages.append(next_page)
+        next_page += len(batch)
+    
+    structured = {}
+    for batch_result in await asyncio.gather(*[structure_batch(batch, first) for batch, first in zip(batches, first_pages)]):
+        structured.update(batch_result)
+    
+    return json.dumps(structured, indent=2)
+
+# Shared Azure OpenAI client (one keep-alive HTTP/2 pool for all agents)
+client = get_azure_client("gpt-4o")
 
 # Create function tools
 crawl_tool = FunctionTool(
@@ -74,11 +157,16 @@ structure_tool = FunctionTool(
     description="Structures raw crawled data according to a given ontology using few-shot learning examples."
 )
 
+structure_batch_tool = FunctionTool(
+    structure_crawled_data_batch,
+    description="Structures a list of crawled pages according to a given ontology in batched model calls, returning one JSON object keyed by page number."
+)
+
 # Define the Web Crawling Agent
 web_crawling_agent = AssistantAgent(
     name="WebCrawlingAgent",
     model_client=client,
-    tools=[crawl_tool, structure_tool],
+    tools=[crawl_tool, structure_tool, structure_batch_tool],
     system_message="""You are a specialized web crawling and data structuring agent. Your role is to:
 
 1. **Web Crawling**: Use the crawl_website_wrapper tool to extract content from websites
@@ -90,6 +178,7 @@ web_crawling_agent = AssistantAgent(
    - Apply few-shot learning techniques when provided with examples
    - Follow the specified ontology schema precisely
    - Maintain data quality and completeness during transformation
+   - When a crawl returns several pages, pass them all to structure_crawled_data_batch in one call instead of structuring page by page
 
 3. **Chain of Thought Processing**: For each task, follow this approach:
    - ANALYZE: Understand the target website and desired ontology structure
@@ -108,6 +197,13 @@ Always provide clear explanations of your structuring decisions and any assumpti
     reflect_on_tool_use=True,
 )
 
+# Progress headers streamed the first time each tool is called
+_TOOL_HEADERS = {
+    "crawl_website_wrapper": "\n\n🕷️ **Crawling website...**\n",
+    "structure_crawled_data": "\n\n🏗️ **Structuring data according to ontology...**\n",
+    "structure_crawled_data_batch": "\n\n🏗️ **Structuring crawled pages in batches...**\n",
+}
+
 # Async runner for the agent
 async def run_web_crawling_agent(user_input: str) -> AsyncGenerator[str, None]:
     """
@@ -130,43 +226,44 @@ async def run_web_crawling_agent(user_input: str) -> AsyncGenerator[str, None]:
     result_shown = False
     
     async for chunk_event in stream:
-        if isinstance(chunk_event, str):
+        if type(chunk_event) is str:
             yield chunk_event
-            
-        elif hasattr(chunk_event, 'content'):
-            if isinstance(chunk_event.content, list):
-                for function_call in chunk_event.content:
-                    if hasattr(function_call, 'name'):
-                        tool_name = function_call.name
-                        
-                        if tool_name not in announced_tools:
-                            announced_tools.add(tool_name)
-                            
-                            if tool_name == "crawl_website_wrapper":
-                                yield f"\n\n🕷️ **Crawling website...**\n"
-                            elif tool_name == "structure_crawled_data":
-                                yield f"\n\n🏗️ **Structuring data according to ontology...**\n"
-                            
-                            if hasattr(function_call, 'arguments'):
-                                try:
-                                    import json
-                                    if isinstance(function_call.arguments, str):
-                                        try:
-                                            args_obj = json.loads(function_call.arguments)
-                                            if args_obj:
-                                                args_formatted = json.dumps(args_obj, indent=2)
-                                                yield f"\n📋 **Parameters:**\n```json\n{args_formatted}\n```\n\n"
-                                        except:
-                                            pass
-                                except Exception:
-                                    pass
-                        
-            elif isinstance(chunk_event.content, str):
-                if announced_tools and not result_shown:
-                    yield f"\n\n✅ **Results:**\n\n"
-                    result_shown = True
+            continue
+        
+        # Status and heartbeat events carry no content; skip them outright
+        content = getattr(chunk_event, 'content', None)
+        if content is None:
+            continue
+        content_type = type(content)
+        
+        if content_type is list:
+            for function_call in content:
+                tool_name = getattr(function_call, 'name', None)
+                if tool_name is None or tool_name in announced_tools:
+                    continue
+                announced_tools.add(tool_name)
+                
+                header = _TOOL_HEADERS.get(tool_name)
+                if header:
+                    yield header
+                
+                arguments = getattr(function_call, 'arguments', None)
+                if type(arguments) is str:
+                    try:
+                        args_obj = json.loads(arguments)
+                    except ValueError:
+                        args_obj = None
+                    if args_obj:
+                        args_formatted = json.dumps(args_obj, indent=2)
+                        yield f"\n📋 **Parameters:**\n```json\n{args_formatted}\n```\n\n"
                     
-                yield chunk_event.content
+        elif content_type is str:
+            # result_shown is checked first so later text events stop after one test
+            if not result_shown and announced_tools:
+                yield f"\n\n✅ **Results:**\n\n"
+                result_shown = True
+                
+            yield content
 
 # Synchronous runner for simple use cases
 async def run_web_crawling_agent_simple(user_input: str) -> str:
@@ -206,9 +303,10 @@ def create_ontology_crawling_prompt(
     Returns:
         Formatted prompt for the agent
     """
-    urls_text = "\n".join([f"- {url}" for url in urls])
+    # An f-string is compiled once with the module; only the URL list is built per call
+    urls_text = "- " + "\n- ".join(urls) if urls else ""
     
-    prompt = f"""I need you to crawl the following URLs and structure the extracted data according to the specified ontology:
+    return f"""I need you to crawl the following URLs and structure the extracted data according to the specified ontology:
 
 **URLs to Crawl:**
 {urls_text}
@@ -230,6 +328,4 @@ Please:
 2. Structure the extracted data according to the ontology schema
 3. Use the few-shot examples as templates for the transformation
 4. Provide the final structured data in JSON format
-"""
-    
-    return prompt 
\ No newline at end of file
+""" 
\ No newline at end of file
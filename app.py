@@ -1,6 +1,8 @@
+import asyncio
+import time
 import chainlit as cl
 from orchestrator.multi_agent_router import multi_agent_dispatch_stream
-from typing import Optional
+from typing import AsyncIterator, Optional
 import json
 
 # Constants for agent types
@@ -8,6 +10,76 @@ SEARCH_AGENT = "search"
 WEB_CRAWLING_AGENT = "web_crawling"
 DOCUMENT_AGENT = "document"
 
+# Loader tokens emitted by the agents that should not reach the UI
+LOADER_TOKENS = {"⏳ Thinking...", "🚀 Initializing Enhanced Web Crawling Agent..."}
+
+# Streamed tokens are coalesced before each websocket send: a chunk is flushed
+# once it reaches STREAM_FLUSH_CHARS or has waited STREAM_FLUSH_SECONDS
+STREAM_FLUSH_CHARS = 32
+STREAM_FLUSH_SECONDS = 0.05
+
+async def coalesce_tokens(
+    tokens: AsyncIterator[str],
+    max_chars: int = STREAM_FLUSH_CHARS,
+    max_delay: float = STREAM_FLUSH_SECONDS
+) -> AsyncIterator[str]:
+    """
+    Merge a token stream into fewer, larger chunks.
+    
+    Pending text is flushed on size, or when max_delay passes without a flush,
+    even if the source stream is stalled (e.g. while an agent runs a tool).
+    If the source raises, pending text is flushed before the error propagates.
+    """
+    iterator = tokens.__aiter__()
+    pending = []
+    pending_chars = 0
+    last_flush = time.monotonic()
+    next_token = asyncio.ensure_future(iterator.__anext__())
+    
+    try:
+        while True:
+            timeout = max(0.0, last_flush + max_delay - time.monotonic()) if pending else None
+            done, _ = await asyncio.wait({next_token}, timeout=timeout)
+            
+            if done:
+                try:
+                    token = next_token.result()
+                except StopAsyncIteration:
+                    break
+                except Exception:
+                    # Deliver what was already received before surfacing the error
+                    if pending:
+                        yield "".join(pending)
+                        pending.clear()
+                    raise
+                pending.append(token)
+                pending_chars += len(token)
+                next_token = asyncio.ensure_future(iterator.__anext__())
+            
+            if pending and (pending_chars >= max_chars or time.monotonic() - last_flush >= max_delay):
+                yield "".join(pending)
+                pending.clear()
+                pending_chars = 0
+                last_flush = time.monotonic()
+    finally:
+        if not next_token.done():
+            next_token.cancel()
+    
+    if pending:
+        yield "".join(pending)
+
+async def content_tokens(user_input: str) -> AsyncIterator[str]:
+    """Stream the routed agent's tokens, skipping empty and loader tokens."""
+    async for token in multi_agent_dispatch_stream(user_input):
+        if token and token.strip():  # Ensure token has content
+            print(f"DEBUG: Received token: {repr(token)}")  # Debug output - show full token
+            
+            # Skip various loader tokens
+            if token.strip() in LOADER_TOKENS:
+                continue
+            
+            yield token
+
 @cl.set_chat_profiles
 async def chat_profiles(current_user: cl.User):
     return [
@@ -79,24 +151,17 @@ async def handle_universal_message(message: cl.Message):
         full_response = ""
         first_content_received = False
         
-        # Stream tokens from the appropriate agent
-        async for token in multi_agent_dispatch_stream(user_input):
-            if token and token.strip():  # Ensure token has content
-                print(f"DEBUG: Received token: {repr(token)}")  # Debug output - show full token
-                
-                # Skip various loader tokens
-                if token.strip() in ["⏳ Thinking...", "🚀 Initializing Enhanced Web Crawling Agent..."]:
-                    continue
-                
-                # For the first real token, clear "Thinking..." and start fresh
-                if not first_content_received:
-                    msg.content = ""
-                    await msg.update()
-                    first_content_received = True
-                
-                # Add token to full response and stream it
-                full_response += token
-                await msg.stream_token(token)
+        # Stream tokens from the appropriate agent, coalesced into fewer websocket sends
+        async for chunk in coalesce_tokens(content_tokens(user_input)):
+            # For the first real chunk, clear "Thinking..." and start fresh
+            if not first_content_received:
+                msg.content = ""
+                await msg.update()
+                first_content_received = True
+            
+            # Add chunk to full response and stream it
+            full_response += chunk
+            await msg.stream_token(chunk)
         
         # If no streaming content was received, get the complete response
         if not full_response.strip():
@@ -1,4 +1,5 @@
 from openai import AzureOpenAI
+import httpx
 import os
 
 
@@ -22,7 +23,8 @@ api_endpoint = os.getenv("OAI_ENDPOINT")
 client = AzureOpenAI(
   azure_endpoint = api_endpoint, 
   api_key=api_key,
-  api_version="2025-04-14"
+  api_version="2025-04-14",
+  http_client=httpx.Client(http2=True, limits=httpx.Limits(max_connections=100, max_keepalive_connections=20))
 )
 
 response = client.chat.completions.create(
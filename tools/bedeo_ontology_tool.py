@@ -2,13 +2,86 @@
 BEDEO Ontology Tool - Load and parse BEDEO ontology for agents to use
 """
 import os
+import pickle
+from functools import lru_cache
 from typing import Dict, List, Set
 import re
 
+_BEDEO_NS = 'https://csse.utoronto.ca/'
+
+# Declared BEDEO terms, bucketed by the key they are returned under
+_TERM_TYPES_QUERY = """
+SELECT ?term ?type WHERE {
+    ?term rdf:type ?type .
+    FILTER(?type IN (owl:Class, owl:ObjectProperty, owl:DatatypeProperty))
+}
+"""
+
+# Every bedeo: term in one pass. Instance IRIs minted from the example template
+# (e.g. bedeo:address_Foo) match the first branch; vocabulary terms capture group 1.
+_TERM_RE = re.compile(r'bedeo:(?:(?:organization|opportunity|realEstateAsset|address)_\w*|(\w+))')
+
+def _parse_vocabulary(ontology_path: str) -> Dict[str, List[str]]:
+    """Parse bedeo.ttl with rdflib and collect its classes and properties in one SPARQL query."""
+    import rdflib
+    from rdflib.namespace import OWL, RDF
+    
+    graph = rdflib.Graph()
+    graph.parse(ontology_path, format='turtle')
+    
+    buckets = {
+        OWL.Class: set(),
+        OWL.ObjectProperty: set(),
+        OWL.DatatypeProperty: set()
+    }
+    for term, term_type in graph.query(_TERM_TYPES_QUERY, initNs={'rdf': RDF, 'owl': OWL}):
+        # Skip blank nodes (anonymous class expressions) and terms from other vocabularies
+        if isinstance(term, rdflib.URIRef) and term.startswith(_BEDEO_NS) and term != _BEDEO_NS:
+            buckets[term_type].add(f"bedeo:{term[len(_BEDEO_NS):]}")
+    
+    return {
+        'classes': sorted(buckets[OWL.Class]),
+        'object_properties': sorted(buckets[OWL.ObjectProperty]),
+        'data_properties': sorted(buckets[OWL.DatatypeProperty])
+    }
+
+def _load_vocabulary(ontology_path: str) -> Dict[str, List[str]]:
+    """
+    Return the parsed vocabulary, from a pickle next to bedeo.ttl when it is current.
+    
+    The pickle records the mtime of the Turtle file it was built from and is
+    rebuilt whenever that changes.
+    """
+    cache_path = ontology_path + '.pkl'
+    source_mtime = os.path.getmtime(ontology_path)
+    
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = pickle.load(f)
+        if cached.get('source_mtime') == source_mtime:
+            return cached['vocabulary']
+    except Exception:
+        pass
+    
+    vocabulary = _parse_vocabulary(ontology_path)
+    try:
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'source_mtime': source_mtime, 'vocabulary': vocabulary}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return vocabulary
+
+@lru_cache(maxsize=1)
 def load_bedeo_ontology() -> Dict[str, any]:
     """
     Load and parse the BEDEO ontology from bedeo.ttl file.
     
+    The Turtle file is parsed with rdflib and the result is pickled next to it,
+    so later processes skip the parse; within a process it is cached after the
+    first call. Callers must treat the returned dictionary as read-only.
+    
     Returns:
         Dictionary containing:
         - classes: List of BEDEO classes
@@ -21,26 +94,10 @@ def load_bedeo_ontology() -> Dict[str, any]:
     if not os.path.exists(ontology_path):
         raise FileNotFoundError(f"BEDEO ontology file not found at {ontology_path}")
     
-    with open(ontology_path, 'r') as f:
-        content = f.read()
-    
-    # Parse classes
-    classes = set()
-    class_pattern = r'bedeo:(\w+)\s+rdf:type\s+owl:Class'
-    for match in re.finditer(class_pattern, content):
-        classes.add(f"bedeo:{match.group(1)}")
-    
-    # Parse object properties
-    object_properties = set()
-    prop_pattern = r'bedeo:(\w+)\s+rdf:type\s+owl:ObjectProperty'
-    for match in re.finditer(prop_pattern, content):
-        object_properties.add(f"bedeo:{match.group(1)}")
-    
-    # Parse data properties
-    data_properties = set()
-    data_prop_pattern = r'bedeo:(\w+)\s+rdf:type\s+owl:DatatypeProperty'
-    for match in re.finditer(data_prop_pattern, content):
-        data_properties.add(f"bedeo:{match.group(1)}")
+    vocabulary = _load_vocabulary(ontology_path)
+    classes = vocabulary['classes']
+    object_properties = vocabulary['object_properties']
+    data_properties = vocabulary['data_properties']
     
     # Create example template based on BEDEO ontology
     example_template = """@prefix bedeo: <https://csse.utoronto.ca/> .
@@ -81,9 +138,9 @@ bedeo:address_[AssetName]
     bedeo:has_country_name "[Country]"^^xsd:string ."""
     
     return {
-        'classes': sorted(list(classes)),
-        'object_properties': sorted(list(object_properties)),
-        'data_properties': sorted(list(data_properties)),
+        'classes': classes,
+        'object_properties': object_properties,
+        'data_properties': data_properties,
         'example_template': example_template,
         'total_classes': len(classes),
         'total_properties': len(object_properties) + len(data_properties)
@@ -102,6 +159,12 @@ def get_bedeo_properties() -> Dict[str, List[str]]:
         'data_properties': ontology['data_properties']
     }
 
+@lru_cache(maxsize=1)
+def _valid_terms() -> frozenset:
+    """All classes and properties declared in the BEDEO ontology."""
+    ontology = load_bedeo_ontology()
+    return frozenset(ontology['classes'] + ontology['object_properties'] + ontology['data_properties'])
+
 def validate_rdf_against_bedeo(rdf_content: str) -> Dict[str, any]:
     """
     Validate that RDF content uses only BEDEO vocabulary.
@@ -112,23 +175,17 @@ def validate_rdf_against_bedeo(rdf_content: str) -> Dict[str, any]:
     Returns:
         Dictionary with validation results
     """
-    ontology = load_bedeo_ontology()
-    valid_terms = set(ontology['classes'] + ontology['object_properties'] + ontology['data_properties'])
-    
-    # Find all bedeo: terms in the content
-    used_terms = set()
-    term_pattern = r'bedeo:(\w+)'
-    for match in re.finditer(term_pattern, rdf_content):
-        used_terms.add(f"bedeo:{match.group(1)}")
+    valid_terms = _valid_terms()
     
-    # Check for invalid terms
-    invalid_terms = []
-    for term in used_terms:
-        if term not in valid_terms and not term.startswith('bedeo:organization_') \
-           and not term.startswith('bedeo:opportunity_') \
-           and not term.startswith('bedeo:realEstateAsset_') \
-           and not term.startswith('bedeo:address_'):
-            invalid_terms.append(term)
+    # Find all bedeo: terms and check them against the vocabulary in a single scan
+    used_terms = {}
+    invalid_terms = {}
+    for match in _TERM_RE.finditer(rdf_content):
+        term = match.group(0)
+        used_terms[term] = None
+        if match.group(1) is not None and term not in valid_terms:
+            invalid_terms[term] = None
+    invalid_terms = list(invalid_terms)
     
     return {
         'is_valid': len(invalid_terms) == 0,
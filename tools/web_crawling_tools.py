@@ -1,17 +1,79 @@
+import os
+import atexit
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlparse, urlsplit, urlunparse
+from urllib.robotparser import RobotFileParser
 import json
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Union
 import time
+import pickle
+import hashlib
+import threading
+import multiprocessing
+from collections import defaultdict
 import re
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, asdict
 import PyPDF2
 from io import BytesIO
 
-@dataclass
+# selectolax's lexbor backend is a C HTML parser; BeautifulSoup is the fallback
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# pypdfium2 wraps the PDFium C++ library; PyPDF2 is the pure-Python fallback
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# Crawl results are handed on as UTF-8 JSON bytes; orjson produces them directly
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+# One keep-alive session for every fetch in the process. Batch crawls run
+# web_crawling_tool on several worker threads at once; sharing the session
+# lets them reuse pooled connections instead of opening one per request.
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+})
+_ADAPTER = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    # Connection-level retries only. urllib3 would otherwise sleep for any
+    # Retry-After on 429/503 with no upper bound; status-based retries are left
+    # to callers, which see status_code/retry_after in the error page metadata.
+    max_retries=Retry(total=2, backoff_factor=0.3, respect_retry_after_header=False)
+)
+_SESSION.mount('https://', _ADAPTER)
+_SESSION.mount('http://', _ADAPTER)
+atexit.register(_SESSION.close)
+
+# Requests allowed in flight against a single host during one crawl
+_MAX_CONCURRENT_PER_HOST = 4
+
+# Only the first 5000 characters of a page are kept, so there is no point in
+# downloading more than this many bytes of any single response
+_MAX_RESPONSE_BYTES = 2_000_000
+_CHUNK_SIZE = 65536
+
+@dataclass(slots=True)
 class CrawledContent:
-    """Data structure for crawled content."""
+    """Data structure for crawled content. Slotted: a crawl holds many of these."""
     url: str
     title: str
     content: str
@@ -20,47 +82,336 @@ class CrawledContent:
     links: List[str]
     crawl_depth: int
 
+@dataclass(slots=True)
+class _FetchedBody:
+    """A downloaded response body waiting to be parsed into CrawledContent."""
+    url: str
+    depth: int
+    content_type: str
+    encoding: Optional[str]
+    body: bytes
+    content_hash: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+# On-disk HTTP cache: per URL, the response validators, a hash of the body and
+# the extracted page, so unchanged pages skip both the download and the parse.
+# Each URL is one pickle file in a per-user cache directory. Entries expire
+# after _HTTP_CACHE_MAX_AGE seconds, pages longer than _HTTP_CACHE_MAX_CHARS
+# are not stored, and the oldest files are evicted beyond _HTTP_CACHE_MAX_ENTRIES.
+def _default_cache_dir() -> str:
+    """Per-user cache directory, e.g. ~/.cache/bedeo/http or %LOCALAPPDATA%\\bedeo\\http."""
+    root = os.getenv("LOCALAPPDATA") or os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(root, "bedeo", "http")
+
+_HTTP_CACHE_DIR = os.getenv("BEDEO_HTTP_CACHE") or _default_cache_dir()
+_HTTP_CACHE_MAX_AGE = 7 * 24 * 3600
+_HTTP_CACHE_MAX_ENTRIES = 2000
+_HTTP_CACHE_MAX_CHARS = 200_000
+# Eviction scans the directory once per this many writes
+_HTTP_CACHE_PRUNE_EVERY = 200
+_http_cache_writes = 0
+_http_cache_lock = threading.Lock()
+
+def _cache_file(url: str) -> str:
+    """Path of the cache file for url."""
+    return os.path.join(_HTTP_CACHE_DIR, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.pickle')
+
+def _cache_get(url: str) -> Optional[Dict[str, Any]]:
+    """Return the cached entry for url, or None if missing or expired."""
+    path = _cache_file(url)
+    try:
+        if time.time() - os.path.getmtime(path) > _HTTP_CACHE_MAX_AGE:
+            os.remove(path)
+            return None
+        with open(path, 'rb') as f:
+            entry = pickle.load(f)
+        return entry if entry.get('url') == url else None
+    except Exception:
+        return None
+
+def _remove_quietly(path: str) -> None:
+    """Delete a file, ignoring files already gone or locked."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _prune_http_cache() -> None:
+    """Delete expired cache files, then the oldest ones beyond _HTTP_CACHE_MAX_ENTRIES."""
+    now = time.time()
+    files = []
+    with os.scandir(_HTTP_CACHE_DIR) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.pickle'):
+                continue
+            try:
+                mtime = entry.stat().st_mtime
+            except OSError:
+                continue
+            if now - mtime > _HTTP_CACHE_MAX_AGE:
+                _remove_quietly(entry.path)
+            else:
+                files.append((mtime, entry.path))
+    if len(files) > _HTTP_CACHE_MAX_ENTRIES:
+        files.sort()
+        for _, path in files[:len(files) - _HTTP_CACHE_MAX_ENTRIES]:
+            _remove_quietly(path)
+
+def _cache_put(fetched: _FetchedBody, page: CrawledContent) -> None:
+    """Store the validators and extracted page for a successfully crawled URL."""
+    global _http_cache_writes
+    if len(page.content) > _HTTP_CACHE_MAX_CHARS:
+        return
+    entry = {
+        'url': fetched.url,
+        'etag': fetched.etag,
+        'last_modified': fetched.last_modified,
+        'content_hash': fetched.content_hash,
+        'page': asdict(page)
+    }
+    try:
+        os.makedirs(_HTTP_CACHE_DIR, exist_ok=True)
+        path = _cache_file(fetched.url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        
+        with _http_cache_lock:
+            _http_cache_writes += 1
+            prune = _http_cache_writes % _HTTP_CACHE_PRUNE_EVERY == 1
+        if prune:
+            _prune_http_cache()
+    except Exception:
+        pass
+
+def _revalidation_headers(cached: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Build conditional request headers from a cache entry."""
+    headers = {}
+    if cached is not None:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+    return headers
+
+def _read_capped(response: requests.Response) -> Tuple[bytes, bool]:
+    """
+    Read a streamed response body, stopping at _MAX_RESPONSE_BYTES.
+    
+    Returns the body and whether it was truncated at the cap.
+    """
+    content_length = response.headers.get('Content-Length', '')
+    if content_length.isdigit() and int(content_length) > _MAX_RESPONSE_BYTES:
+        raise ValueError(f"Response too large: {content_length} bytes (limit {_MAX_RESPONSE_BYTES})")
+    
+    buf = bytearray()
+    truncated = False
+    for chunk in response.iter_content(_CHUNK_SIZE):
+        buf.extend(chunk)
+        if len(buf) > _MAX_RESPONSE_BYTES:
+            del buf[_MAX_RESPONSE_BYTES:]
+            truncated = True
+            break
+    return bytes(buf), truncated
+
+def _reject_truncated_pdf(truncated: bool) -> None:
+    """A cut-off PDF cannot be parsed, so report it as too large instead."""
+    if truncated:
+        raise ValueError(f"Response too large: PDF exceeds the {_MAX_RESPONSE_BYTES} byte limit")
+
+def _decode_body(body: bytes, encoding: Optional[str]) -> str:
+    """Decode a response body using the charset the server declared."""
+    try:
+        return body.decode(encoding or 'utf-8', errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL for deduplication: lowercase scheme and host, drop the fragment."""
+    parts = urlparse(url)
+    return urlunparse((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', parts.params, parts.query, ''))
+
+# robots.txt rules per origin, refetched once a day and capped at a fixed number of origins
+_ROBOTS_TTL = 24 * 3600
+_ROBOTS_MAX_ORIGINS = 1024
+_robots_cache: Dict[str, RobotFileParser] = {}
+_robots_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+_robots_lock = threading.Lock()
+
+def _fetch_robots(origin: str) -> RobotFileParser:
+    """Download and parse an origin's robots.txt; unreachable files allow everything."""
+    parser = RobotFileParser(f"{origin}/robots.txt")
+    try:
+        with _SESSION.get(parser.url, stream=True, timeout=(5, 10)) as response:
+            if response.status_code in (401, 403):
+                parser.disallow_all = True
+            elif response.ok:
+                parser.parse(_decode_body(_read_capped(response)[0], response.encoding).splitlines())
+            else:
+                parser.allow_all = True
+    except Exception:
+        parser.allow_all = True
+    # Stamp every outcome, not just parsed files, so mtime() drives the TTL
+    parser.modified()
+    return parser
+
+def _robots_stale(parser: Optional[RobotFileParser]) -> bool:
+    """Whether an origin's rules are missing or older than _ROBOTS_TTL."""
+    return parser is None or time.time() - parser.mtime() > _ROBOTS_TTL
+
+def _store_robots(origin: str, parser: RobotFileParser) -> None:
+    """Cache an origin's rules, evicting expired and then the oldest origins when full."""
+    with _robots_lock:
+        if origin not in _robots_cache and len(_robots_cache) >= _ROBOTS_MAX_ORIGINS:
+            evict = [o for o, p in _robots_cache.items() if _robots_stale(p)]
+            if not evict:
+                evict = [min(_robots_cache, key=lambda o: _robots_cache[o].mtime())]
+            for stale_origin in evict:
+                del _robots_cache[stale_origin]
+                _robots_locks.pop(stale_origin, None)
+        _robots_cache[origin] = parser
+
+def is_allowed_by_robots(url: str) -> bool:
+    """Check whether robots.txt lets this crawler's User-Agent fetch url."""
+    parts = urlparse(url)
+    origin = f"{parts.scheme}://{parts.netloc}"
+    parser = _robots_cache.get(origin)
+    if _robots_stale(parser):
+        with _robots_lock:
+            origin_lock = _robots_locks[origin]
+        # One fetch per origin even when a whole level hits a new host at once
+        with origin_lock:
+            parser = _robots_cache.get(origin)
+            if _robots_stale(parser):
+                parser = _fetch_robots(origin)
+                _store_robots(origin, parser)
+    return parser.can_fetch(_SESSION.headers['User-Agent'], url)
+
 def extract_pdf_content(pdf_url: str) -> str:
     """Extract text content from PDF URLs."""
     try:
-        response = requests.get(pdf_url, timeout=30)
-        response.raise_for_status()
-        
-        pdf_file = BytesIO(response.content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        
-        return text.strip()
+        with _SESSION.get(pdf_url, stream=True, timeout=(5, 25)) as response:
+            response.raise_for_status()
+            body, truncated = _read_capped(response)
+        _reject_truncated_pdf(truncated)
+        return extract_pdf_bytes(body)
     except Exception as e:
         return f"Error extracting PDF content: {str(e)}"
 
-def extract_html_content(html_content: str, url: str) -> tuple:
-    """Extract structured content from HTML."""
-    soup = BeautifulSoup(html_content, 'html.parser')
+def _extract_pdf_text_pdfium(pdf_data: bytes) -> str:
+    """Extract the text of every page with PDFium."""
+    pdf = pdfium.PdfDocument(pdf_data)
+    try:
+        texts = []
+        for page in pdf:
+            textpage = page.get_textpage()
+            # PDFium ends lines with \r\n; PyPDF2 and the HTML paths use \n
+            texts.append(textpage.get_text_bounded().replace("\r\n", "\n").replace("\r", "\n"))
+            textpage.close()
+            page.close()
+        return "\n".join(texts).strip()
+    finally:
+        pdf.close()
+
+def _extract_pdf_text(pdf_data: bytes) -> str:
+    """Extract text content from an already downloaded PDF, raising on failure."""
+    if pdfium is not None:
+        return _extract_pdf_text_pdfium(pdf_data)
+    
+    pdf_file = BytesIO(pdf_data)
+    pdf_reader = PyPDF2.PdfReader(pdf_file)
+    
+    text = ""
+    for page in pdf_reader.pages:
+        text += page.extract_text() + "\n"
+    
+    return text.strip()
+
+def extract_pdf_bytes(pdf_data: bytes) -> str:
+    """Extract text content from an already downloaded PDF."""
+    try:
+        return _extract_pdf_text(pdf_data)
+    except Exception as e:
+        return f"Error extracting PDF content: {str(e)}"
+
+_META_FIELDS = ('description', 'keywords', 'author')
+
+# Links to static assets are never worth crawling, so they are not collected.
+# Matched against the URL path only, so pages like view?img=x.png are kept.
+_ASSET_LINK_RE = re.compile(
+    r'\.(?:css|js|mjs|png|jpe?g|gif|svg|ico|webp|bmp|woff2?|ttf|eot|mp3|mp4|webm|avi|zip|gz)$',
+    re.IGNORECASE
+)
+
+def _resolve_link(href: str, url: str) -> Optional[str]:
+    """Resolve href against url, returning None for non-HTTP links and static assets."""
+    if href.startswith(('http://', 'https://')):
+        full_url = href
+    else:
+        full_url = urljoin(url, href)
+        if not full_url.startswith(('http://', 'https://')):
+            return None
+    if _ASSET_LINK_RE.search(urlsplit(full_url).path):
+        return None
+    return full_url
+
+def _parse_html_lexbor(html_content: str) -> Tuple[str, str, List[str], Dict[str, str]]:
+    """Parse HTML with selectolax's lexbor (C) backend."""
+    tree = LexborHTMLParser(html_content)
+    
+    # Remove script and style elements
+    for node in tree.css('script, style'):
+        node.decompose()
+    
+    title_node = tree.css_first('title')
+    title = title_node.text(strip=True) if title_node is not None else ""
+    text = tree.root.text() if tree.root is not None else ""
+    hrefs = [a.attributes.get('href') or '' for a in tree.css('a[href]')]
+    
+    meta = {}
+    for name in _META_FIELDS:
+        node = tree.css_first(f'meta[name="{name}"]')
+        if node is not None:
+            meta[name] = node.attributes.get('content') or ''
+    
+    return title, text, hrefs, meta
+
+def _parse_html_soup(html_content: str) -> Tuple[str, str, List[str], Dict[str, str]]:
+    """Parse HTML with BeautifulSoup on lxml, used when selectolax is not installed."""
+    soup = BeautifulSoup(html_content, 'lxml')
     
     # Remove script and style elements
     for script in soup(["script", "style"]):
         script.decompose()
     
-    # Extract title
-    title = ""
-    if soup.title:
-        title = soup.title.string.strip()
+    title = soup.title.get_text().strip() if soup.title else ""
+    text = soup.get_text()
+    hrefs = [link['href'] for link in soup.find_all('a', href=True)]
     
-    # Extract main content
-    content = soup.get_text()
-    content = re.sub(r'\s+', ' ', content).strip()
+    meta = {}
+    for name in _META_FIELDS:
+        node = soup.find('meta', attrs={'name': name})
+        if node:
+            meta[name] = node.get('content', '')
     
-    # Extract links
-    links = []
-    for link in soup.find_all('a', href=True):
-        href = link['href']
-        full_url = urljoin(url, href)
-        if full_url.startswith(('http://', 'https://')):
-            links.append(full_url)
+    return title, text, hrefs, meta
+
+def extract_html_content(html_content: str, url: str) -> tuple:
+    """Extract structured content from HTML."""
+    if LexborHTMLParser is not None:
+        title, content, hrefs, meta = _parse_html_lexbor(html_content)
+    else:
+        title, content, hrefs, meta = _parse_html_soup(html_content)
+    
+    # Collapse whitespace in the main content; str.split() does this in C
+    content = ' '.join(content.split())
+    
+    # Extract links, deduplicated in document order
+    links = list(dict.fromkeys(
+        full_url for full_url in (_resolve_link(href.strip(), url) for href in hrefs) if full_url
+    ))
     
     # Extract metadata
     metadata = {
@@ -69,88 +420,212 @@ def extract_html_content(html_content: str, url: str) -> tuple:
         'author': '',
         'published_date': ''
     }
-    
-    # Meta description
-    meta_desc = soup.find('meta', attrs={'name': 'description'})
-    if meta_desc:
-        metadata['description'] = meta_desc.get('content', '')
-    
-    # Meta keywords
-    meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
-    if meta_keywords:
-        metadata['keywords'] = meta_keywords.get('content', '')
-    
-    # Author
-    meta_author = soup.find('meta', attrs={'name': 'author'})
-    if meta_author:
-        metadata['author'] = meta_author.get('content', '')
+    metadata.update(meta)
     
     return title, content, links, metadata
 
-def crawl_single_url(url: str, depth: int = 0) -> CrawledContent:
-    """Crawl a single URL and extract content."""
+def _error_page(url: str, depth: int, e: Exception) -> CrawledContent:
+    """Describe a failed crawl as CrawledContent."""
+    metadata = {'error': str(e), 'error_type': type(e).__name__}
+    # Surface HTTP status so callers can decide whether to retry
+    error_response = getattr(e, 'response', None)
+    if error_response is not None:
+        metadata['status_code'] = error_response.status_code
+        metadata['retry_after'] = error_response.headers.get('Retry-After')
+    return CrawledContent(
+        url=url,
+        title="Error",
+        content=f"Error crawling {url}: {str(e)}",
+        metadata=metadata,
+        content_type='error',
+        links=[],
+        crawl_depth=depth
+    )
+
+def _fetch_page(url: str, depth: int) -> Union[CrawledContent, _FetchedBody]:
+    """
+    Download url, revalidating against the on-disk HTTP cache.
+    
+    Returns finished CrawledContent when no parsing is needed (a 304, a body
+    identical to the cached one, or an error), otherwise the body to parse.
+    Bodies are streamed and capped at _MAX_RESPONSE_BYTES.
+    """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
+        cached = _cache_get(url)
+        with _SESSION.get(url, headers=_revalidation_headers(cached), stream=True, timeout=(5, 25)) as response:
+            if cached is not None and response.status_code == 304:
+                return CrawledContent(**{**cached['page'], 'crawl_depth': depth})
+            response.raise_for_status()
+            body, truncated = _read_capped(response)
         
         content_type = response.headers.get('content-type', '').lower()
-        
         if 'application/pdf' in content_type:
-            # Handle PDF content
-            pdf_content = extract_pdf_content(url)
-            return CrawledContent(
-                url=url,
-                title=f"PDF Document: {urlparse(url).path.split('/')[-1]}",
-                content=pdf_content,
-                metadata={'content_type': 'application/pdf'},
-                content_type='pdf',
-                links=[],
-                crawl_depth=depth
-            )
-        
-        elif 'text/html' in content_type:
-            # Handle HTML content
-            title, content, links, metadata = extract_html_content(response.text, url)
-            return CrawledContent(
-                url=url,
-                title=title,
-                content=content,
-                metadata=metadata,
-                content_type='html',
-                links=links,
-                crawl_depth=depth
-            )
+            _reject_truncated_pdf(truncated)
         
-        else:
-            # Handle other text content
-            return CrawledContent(
-                url=url,
-                title=f"Document: {urlparse(url).path.split('/')[-1]}",
-                content=response.text,
-                metadata={'content_type': content_type},
-                content_type='text',
-                links=[],
-                crawl_depth=depth
-            )
-            
+        fetched = _FetchedBody(
+            url=url,
+            depth=depth,
+            content_type=content_type,
+            encoding=response.encoding,
+            body=body,
+            content_hash=hashlib.sha1(body).hexdigest(),
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified')
+        )
+        if cached is not None and cached['content_hash'] == fetched.content_hash:
+            page = CrawledContent(**{**cached['page'], 'crawl_depth': depth})
+            _cache_put(fetched, page)
+            return page
+        return fetched
+    
     except Exception as e:
+        return _error_page(url, depth, e)
+
+def _parse_body(url: str, content_type: str, encoding: Optional[str], body: bytes, depth: int) -> CrawledContent:
+    """
+    Turn a downloaded body into CrawledContent based on its content type.
+    
+    Takes only plain, picklable arguments so it can run in _PARSE_POOL.
+    """
+    if 'application/pdf' in content_type:
+        # Handle PDF content from the bytes already fetched. Extraction errors
+        # propagate, so the caller reports an error page and nothing is cached.
+        pdf_content = _extract_pdf_text(body)
         return CrawledContent(
             url=url,
-            title="Error",
-            content=f"Error crawling {url}: {str(e)}",
-            metadata={'error': str(e)},
-            content_type='error',
+            title=f"PDF Document: {urlparse(url).path.split('/')[-1]}",
+            content=pdf_content,
+            metadata={'content_type': 'application/pdf'},
+            content_type='pdf',
+            links=[],
+            crawl_depth=depth
+        )
+    
+    elif 'text/html' in content_type:
+        # Handle HTML content
+        title, content, links, metadata = extract_html_content(_decode_body(body, encoding), url)
+        return CrawledContent(
+            url=url,
+            title=title,
+            content=content,
+            metadata=metadata,
+            content_type='html',
+            links=links,
+            crawl_depth=depth
+        )
+    
+    else:
+        # Handle other text content
+        return CrawledContent(
+            url=url,
+            title=f"Document: {urlparse(url).path.split('/')[-1]}",
+            content=_decode_body(body, encoding),
+            metadata={'content_type': content_type},
+            content_type='text',
             links=[],
             crawl_depth=depth
         )
 
-def web_crawling_tool(base_url: str, max_depth: int = 2, max_links_per_page: int = 20) -> str:
+def _parse_fetched(fetched: _FetchedBody) -> CrawledContent:
+    """Parse a fetched body in the current process."""
+    return _parse_body(fetched.url, fetched.content_type, fetched.encoding, fetched.body, fetched.depth)
+
+# Process pool for HTML/PDF parsing, created on first use. Parsing is CPU-bound,
+# so running it in other processes lets it overlap with network waits.
+# Workers are spawned, never forked: the pool starts mid-crawl while worker
+# threads are inside requests/urllib3, and forking a threaded process can
+# deadlock the child. Windows caps a process pool at 61 workers.
+_PARSE_POOL: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+_MAX_PARSE_WORKERS = 61
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    """Return the shared parse pool, starting it if needed."""
+    global _PARSE_POOL
+    with _parse_pool_lock:
+        if _PARSE_POOL is None:
+            _PARSE_POOL = ProcessPoolExecutor(
+                max_workers=min(os.cpu_count() or 1, _MAX_PARSE_WORKERS),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            atexit.register(_PARSE_POOL.shutdown)
+        return _PARSE_POOL
+
+def _discard_parse_pool() -> None:
+    """Forget a broken parse pool so the next crawl starts a fresh one."""
+    global _PARSE_POOL
+    with _parse_pool_lock:
+        _PARSE_POOL = None
+
+async def _parse_in_pool(fetched: _FetchedBody) -> CrawledContent:
+    """Parse a fetched body on the process pool, falling back to a worker thread."""
+    try:
+        pool = _get_parse_pool()
+    except (OSError, ValueError, NotImplementedError, RuntimeError):
+        # The platform cannot start the pool; parse here instead
+        return await asyncio.to_thread(_parse_fetched, fetched)
+    
+    try:
+        future = pool.submit(
+            _parse_body,
+            fetched.url, fetched.content_type, fetched.encoding, fetched.body, fetched.depth
+        )
+    except (BrokenProcessPool, RuntimeError):
+        # The pool is broken or was shut down (e.g. at interpreter exit)
+        _discard_parse_pool()
+        return await asyncio.to_thread(_parse_fetched, fetched)
+    
+    try:
+        return await asyncio.wrap_future(future)
+    except BrokenProcessPool:
+        # A worker died mid-parse; parse errors themselves propagate to the caller
+        _discard_parse_pool()
+        return await asyncio.to_thread(_parse_fetched, fetched)
+
+def crawl_single_url(url: str, depth: int = 0) -> CrawledContent:
     """
-    Main web crawling function that crawls websites recursively.
+    Crawl a single URL and extract content.
+    
+    Pages are revalidated against the on-disk HTTP cache: a 304 response, or a
+    body identical to the cached one, reuses the stored extraction. Bodies are
+    streamed and capped at _MAX_RESPONSE_BYTES.
+    """
+    fetched = _fetch_page(url, depth)
+    if isinstance(fetched, CrawledContent):
+        return fetched
+    try:
+        page = _parse_fetched(fetched)
+    except Exception as e:
+        return _error_page(url, depth, e)
+    _cache_put(fetched, page)
+    return page
+
+async def crawl_single_url_async(url: str, depth: int = 0) -> CrawledContent:
+    """
+    Async version of crawl_single_url.
+    
+    The download runs on a worker thread and parsing runs on the process pool,
+    so the event loop stays free to drive other fetches meanwhile.
+    """
+    fetched = await asyncio.to_thread(_fetch_page, url, depth)
+    if isinstance(fetched, CrawledContent):
+        return fetched
+    try:
+        page = await _parse_in_pool(fetched)
+    except Exception as e:
+        return _error_page(url, depth, e)
+    await asyncio.to_thread(_cache_put, fetched, page)
+    return page
+
+async def web_crawling_tool_async(base_url: str, max_depth: int = 2, max_links_per_page: int = 20) -> bytes:
+    """
+    Crawl a website breadth-first, fetching each depth level concurrently.
+    
+    Pages at the same depth are fetched in parallel on worker threads, with at
+    most _MAX_CONCURRENT_PER_HOST requests in flight against any one host, and
+    parsed on a process pool so parsing overlaps with the remaining downloads.
+    URLs are canonicalized before queueing so each page is fetched once, and
+    discovered links are only followed where robots.txt allows it.
     
     Args:
         base_url: Starting URL to crawl
@@ -158,46 +633,55 @@ def web_crawling_tool(base_url: str, max_depth: int = 2, max_links_per_page: int
         max_links_per_page: Maximum number of links to follow per page
     
     Returns:
-        JSON string containing crawling results
+        UTF-8 encoded JSON containing crawling results. json.loads and
+        orjson.loads accept it as is; decode only where text is required.
     """
-    crawled_urls = set()
+    start_url = canonicalize_url(base_url)
+    queued = {start_url}
     results = []
-    urls_to_crawl = [(base_url, 0)]  # (url, depth)
+    host_sems = defaultdict(lambda: asyncio.Semaphore(_MAX_CONCURRENT_PER_HOST))
     
-    while urls_to_crawl:
-        current_url, current_depth = urls_to_crawl.pop(0)
-        
-        if current_url in crawled_urls or current_depth > max_depth:
-            continue
-            
-        crawled_urls.add(current_url)
-        
-        print(f"Crawling: {current_url} (depth: {current_depth})")
-        
-        # Crawl the current URL
-        crawled_content = crawl_single_url(current_url, current_depth)
-        results.append({
-            'url': crawled_content.url,
-            'title': crawled_content.title,
-            'content': crawled_content.content[:5000],  # Limit content length
-            'metadata': crawled_content.metadata,
-            'content_type': crawled_content.content_type,
-            'crawl_depth': crawled_content.crawl_depth,
-            'links_found': len(crawled_content.links)
-        })
+    async def fetch(url: str, depth: int) -> Optional[CrawledContent]:
+        async with host_sems[urlparse(url).netloc]:
+            # The start URL was requested explicitly; only discovered links honour robots.txt
+            if depth > 0 and not await asyncio.to_thread(is_allowed_by_robots, url):
+                return None
+            print(f"Crawling: {url} (depth: {depth})")
+            return await crawl_single_url_async(url, depth)
+    
+    frontier = [start_url]
+    for current_depth in range(max_depth + 1):
+        if not frontier:
+            break
         
-        # Add links to crawl queue if we haven't reached max depth
-        if current_depth < max_depth and crawled_content.content_type == 'html':
-            # Limit the number of links to follow
-            links_to_add = crawled_content.links[:max_links_per_page]
-            for link in links_to_add:
-                if link not in crawled_urls:
-                    urls_to_crawl.append((link, current_depth + 1))
+        # Crawl the whole level at once
+        pages = await asyncio.gather(*[fetch(url, current_depth) for url in frontier])
         
-        # Add a small delay to be respectful
-        time.sleep(1)
+        frontier = []
+        for crawled_content in pages:
+            if crawled_content is None:
+                continue
+            results.append({
+                'url': crawled_content.url,
+                'title': crawled_content.title,
+                'content': crawled_content.content[:5000],  # Limit content length
+                'metadata': crawled_content.metadata,
+                'content_type': crawled_content.content_type,
+                'crawl_depth': crawled_content.crawl_depth,
+                'links_found': len(crawled_content.links)
+            })
+            
+            # Queue links for the next level if we haven't reached max depth
+            if current_depth < max_depth and crawled_content.content_type == 'html':
+                # Limit the number of links to follow
+                links_to_add = crawled_content.links[:max_links_per_page]
+                for link in links_to_add:
+                    link = canonicalize_url(link)
+                    if link not in queued:
+                        queued.add(link)
+                        frontier.append(link)
     
-    return json.dumps({
+    return _dumps({
         'crawl_summary': {
             'total_pages_crawled': len(results),
             'base_url': base_url,
@@ -205,7 +689,25 @@ def web_crawling_tool(base_url: str, max_depth: int = 2, max_links_per_page: int
             'crawl_timestamp': time.time()
         },
         'crawled_data': results
-    }, indent=2)
+    })
+
+def web_crawling_tool(base_url: str, max_depth: int = 2, max_links_per_page: int = 20) -> bytes:
+    """
+    Main web crawling function that crawls websites recursively.
+    
+    Synchronous entry point for web_crawling_tool_async; call it from code that
+    is not already running an event loop.
+    
+    Args:
+        base_url: Starting URL to crawl
+        max_depth: Maximum depth for recursive crawling
+        max_links_per_page: Maximum number of links to follow per page
+    
+    Returns:
+        UTF-8 encoded JSON containing crawling results. json.loads and
+        orjson.loads accept it as is; decode only where text is required.
+    """
+    return asyncio.run(web_crawling_tool_async(base_url, max_depth, max_links_per_page))
 
 def crawl_website(url: str, max_depth: int = 1) -> Dict[str, Any]:
     """